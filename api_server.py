@@ -1,26 +1,95 @@
-from flask import Flask, jsonify, request, abort, render_template  # Import base da Flask per API e template
+from flask import Flask, Response, jsonify, request, abort, render_template  # Import base da Flask per API e template
+from flask.json.provider import JSONProvider  # Base per sostituire l'encoder JSON di Flask
 from flask_cors import CORS  # Abilita CORS per chiamate da frontend in locale o domini diversi
-from dataclasses import dataclass  # Per definire classi dati in modo compatto
-from typing import List  # Tipo per liste tipizzate
+from flask_compress import Compress  # Compressione gzip/brotli delle risposte
+from msgspec import Struct  # Classi dati con slot e serializzazione JSON in C
+from msgspec.json import Encoder  # Encoder JSON di msgspec, veloce sulle Struct a forma fissa
+from msgspec.structs import replace  # Copia di una Struct con alcuni campi modificati
+from typing import Callable, Dict, Iterable, List, Optional, Tuple  # Tipi per annotazioni
+import math  # math.isfinite per scartare prezzi NaN/infiniti
+import gzip  # Variante gzip precalcolata dei payload in cache
+import brotli  # Variante brotli precalcolata (dipendenza già installata da flask-compress)
 import threading  # Per usare un lock thread-safe nelle operazioni di scrittura
+import sys  # sys.intern per normalizzare le sigle provincia
+from operator import attrgetter  # Chiave di ordinamento per id
+import orjson  # Encoder/decoder JSON in Rust, molto più veloce del modulo json standard
 
-# --- App Flask unica ---
+class ORJSONProvider(JSONProvider):
+    # Provider JSON di Flask basato su orjson: usato da jsonify e request.get_json
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)  # Accetta direttamente str o bytes (request.get_json passa i bytes del body)
+
+# --- App Flask unica: pagina web (templates/index.html) e API sullo stesso server ---
 app = Flask(__name__)  # Istanzia l'app Flask
+app.json = ORJSONProvider(app)  # Tutte le risposte/letture JSON passano da orjson
 CORS(app)  # Abilita CORS sull'app
 
+# Compressione delle risposte JSON (brotli o gzip, a livello basso per costare poca CPU)
+app.config["COMPRESS_MIMETYPES"] = ["application/json"]
+app.config["COMPRESS_ALGORITHM"] = ["br", "gzip"]
+app.config["COMPRESS_LEVEL"] = 4  # Livello gzip
+app.config["COMPRESS_BR_LEVEL"] = 4  # Livello brotli
+
+class CompressNegoziato(Compress):
+    # Non ricomprime le risposte che hanno già negoziato la codifica (Vary: Accept-Encoding), cioè
+    # quelle servite dalla cache: flask-compress sceglierebbe anche una codifica con q=0
+    def after_request(self, response):
+        if "accept-encoding" in response.headers.get("Vary", "").lower():
+            return response
+        return super().after_request(response)
+
+CompressNegoziato(app)
+
+# ---------- Viste JSON (forma fissa delle risposte, serializzate da msgspec) ----------
+class PublicDistributore(Struct):
+    # Tutte le informazioni di un distributore (elenco, provincia, singolo distributore)
+    id: int
+    nome: str
+    provincia: str
+    indirizzo: str
+    lat: float
+    lon: float
+    prezzo_benzina: float
+    prezzo_diesel: float
+    livello_benzina: float
+    capacita_benzina: float
+    percent_benzina: float
+    livello_diesel: float
+    capacita_diesel: float
+    percent_diesel: float
+
+class MappaDistributore(Struct):
+    # Dati ridotti per la mappa: coordinate, nome e prezzi
+    id: int
+    nome: str
+    provincia: str
+    lat: float
+    lon: float
+    prezzo_benzina: float
+    prezzo_diesel: float
+
 # ---------- Domain classes ----------
-@dataclass
-class Serbatoio:
+class Serbatoio(Struct):
+    # I serbatoi dello snapshot pubblicato sono condivisi tra snapshot e già serializzati in
+    # _frammenti/_cache: aggiungi/preleva vanno usati solo su istanze nuove o copie. Per cambiare il
+    # livello di un distributore pubblicato si crea un nuovo serbatoio, si sostituisce il distributore
+    # con replace() e si chiama pubblica_snapshot() sotto lock, altrimenti le API servono dati vecchi
     capacita: float  # Capacità massima del serbatoio in litri
     livello: float = 0.0  # Livello corrente in litri (default 0)
 
-    def aggiungi(self, quantita: float):
+    def aggiungi(self, quantita: float) -> None:
         # Aumenta il livello senza superare la capacità
         if quantita < 0:
             raise ValueError("quantita negativa")  # Non si può aggiungere una quantità negativa
-        self.livello = min(self.capacita, self.livello + quantita)  # Clamp a capacità max
+        livello = self.livello + quantita
+        if livello > self.capacita:
+            livello = self.capacita  # Clamp a capacità max (un confronto, senza chiamare min)
+        self.livello = livello
 
-    def preleva(self, quantita: float):
+    def preleva(self, quantita: float) -> None:
         # Diminuisce il livello se sufficiente
         if quantita < 0:
             raise ValueError("quantita negativa")  # Non si può prelevare quantità negativa
@@ -34,8 +103,7 @@ class Serbatoio:
             return 0.0  # Evita divisione per zero
         return (self.livello / self.capacita) * 100.0
 
-@dataclass
-class Distributore:
+class Distributore(Struct):
     id: int  # Identificativo univoco
     nome: str  # Nome commerciale
     provincia: str  # Sigla provincia (es. MI)
@@ -47,41 +115,49 @@ class Distributore:
     prezzo_benzina: float  # Prezzo corrente benzina €/L
     prezzo_diesel: float  # Prezzo corrente diesel €/L
 
-    def to_dict(self) -> dict:
-        # Serializza il distributore in un dict JSON-friendly
-        return {
-            "id": self.id,
-            "nome": self.nome,
-            "provincia": self.provincia,
-            "indirizzo": self.indirizzo,
-            "lat": self.lat,
-            "lon": self.lon,
-            "prezzo_benzina": self.prezzo_benzina,
-            "prezzo_diesel": self.prezzo_diesel,
-            "livello_benzina": self.serbatoio_benzina.livello,
-            "capacita_benzina": self.serbatoio_benzina.capacita,
-            "percent_benzina": self.serbatoio_benzina.percentuale(),
-            "livello_diesel": self.serbatoio_diesel.livello,
-            "capacita_diesel": self.serbatoio_diesel.capacita,
-            "percent_diesel": self.serbatoio_diesel.percentuale(),
-        }
-
-    def set_prezzo(self, tipo: str, nuovo_prezzo: float):
-        # Cambia il prezzo in base al tipo carburante, validando input
-        if nuovo_prezzo < 0:
-            raise ValueError("Prezzo negativo")  # Prezzi negativi non ammessi
-        if tipo == "benzina":
-            self.prezzo_benzina = nuovo_prezzo
-        elif tipo == "diesel":
-            self.prezzo_diesel = nuovo_prezzo
-        else:
-            raise ValueError("Tipo carburante sconosciuto")  # Tipo valido: 'benzina' o 'diesel'
+    def __post_init__(self) -> None:
+        # Normalizza la sigla provincia (maiuscolo, stringa internata): i confronti diventano economici
+        self.provincia = sys.intern(self.provincia.upper())
+
+    def to_public(self) -> PublicDistributore:
+        # Vista JSON completa del distributore
+        return PublicDistributore(
+            id=self.id,
+            nome=self.nome,
+            provincia=self.provincia,
+            indirizzo=self.indirizzo,
+            lat=self.lat,
+            lon=self.lon,
+            prezzo_benzina=self.prezzo_benzina,
+            prezzo_diesel=self.prezzo_diesel,
+            livello_benzina=self.serbatoio_benzina.livello,
+            capacita_benzina=self.serbatoio_benzina.capacita,
+            percent_benzina=self.serbatoio_benzina.percentuale(),
+            livello_diesel=self.serbatoio_diesel.livello,
+            capacita_diesel=self.serbatoio_diesel.capacita,
+            percent_diesel=self.serbatoio_diesel.percentuale(),
+        )
+
+    def to_mappa(self) -> MappaDistributore:
+        # Vista JSON ridotta per la mappa
+        return MappaDistributore(
+            id=self.id,
+            nome=self.nome,
+            provincia=self.provincia,
+            lat=self.lat,
+            lon=self.lon,
+            prezzo_benzina=self.prezzo_benzina,
+            prezzo_diesel=self.prezzo_diesel,
+        )
 
 # --- Dati e lock per threading ---
-lock = threading.Lock()  # Lock per proteggere la struttura dati in scrittura concorrente
+# Copy-on-write: i lettori leggono lo snapshot corrente senza lock (la lettura di una globale è
+# atomica in CPython); gli scrittori creano una nuova tupla con copie modificate e la riassegnano.
+lock = threading.Lock()  # Serializza gli scrittori (PUT prezzi) e la ricostruzione della cache
 
-# Lista in-memory dei distributori (mock/dati di esempio)
-_distributori: List[Distributore] = [
+# Snapshot immutabile dei distributori (mock/dati di esempio); mai modificato sul posto.
+# Invariante: è sempre ordinato per id (eventuali inserimenti futuri: bisect.insort con key=attrgetter("id"))
+_snapshot: Tuple[Distributore, ...] = (
     Distributore(
         id=1,
         nome="IPERSTAR Ovest",
@@ -118,14 +194,89 @@ _distributori: List[Distributore] = [
         prezzo_benzina=1.95,
         prezzo_diesel=1.85,
     ),
-]
+)
+
+# Indici sullo snapshot corrente, ricostruiti ad ogni pubblicazione: id -> distributore e
+# provincia (normalizzata) -> distributori, per evitare scansioni lineari ad ogni richiesta
+_by_id: Dict[int, Distributore] = {}
+_by_provincia: Dict[str, Tuple[Distributore, ...]] = {}
+
+_enc = Encoder()  # Encoder riusato per tutte le risposte cachate
+
+# JSON di ogni distributore (vista pubblica), per id: (istanza serializzata, bytes). Le istanze dello
+# snapshot non vanno mai modificate sul posto (serbatoi compresi, vedi Serbatoio), quindi il frammento
+# resta valido finché l'id punta alla stessa istanza:
+# dopo un PUT si riserializzano solo i distributori sostituiti. Usato solo con lock acquisito.
+_frammenti: Dict[int, Tuple[Distributore, bytes]] = {}
 
-def find_by_id(did: int) -> Distributore:
-    # Cerca un distributore per ID nella lista in-memory, ritorna None se non trovato
-    for d in _distributori:
-        if d.id == did:
-            return d
-    return None
+# Cache dei payload JSON già serializzati, per endpoint (es. "elenco", ("provincia", "MI"), ("id", 1)):
+# per ogni chiave il payload e le sue varianti brotli e gzip (None se troppo piccolo per comprimerlo).
+# Si riempie alla prima lettura e viene svuotata ad ogni modifica dello snapshot.
+_cache: Dict[object, Tuple[bytes, Optional[bytes], Optional[bytes]]] = {}
+
+def pubblica_snapshot(snapshot: Tuple[Distributore, ...]) -> None:
+    # Rende visibile un nuovo snapshot insieme ai suoi indici e invalida la cache (da chiamare con lock)
+    global _snapshot, _by_id, _by_provincia
+    by_provincia: Dict[str, List[Distributore]] = {}
+    for d in snapshot:
+        by_provincia.setdefault(d.provincia, []).append(d)  # Chiave: sigla già maiuscola e internata
+    _snapshot = snapshot
+    _by_id = {d.id: d for d in snapshot}
+    _by_provincia = {p: tuple(ds) for p, ds in by_provincia.items()}  # Liste congelate in tuple immutabili
+    _cache.clear()  # I payload serializzati non sono più validi
+
+pubblica_snapshot(tuple(sorted(_snapshot, key=attrgetter("id"))))  # Ordina una volta per id e costruisce gli indici
+
+def find_by_id(did: int) -> Optional[Distributore]:
+    # Cerca un distributore per ID tramite l'indice, ritorna None se non trovato
+    return _by_id.get(did)
+
+def frammento_public(d: Distributore) -> bytes:
+    # JSON della vista pubblica di d, riusato se d è la stessa istanza già serializzata (chiamare con lock)
+    voce = _frammenti.get(d.id)
+    if voce is None or voce[0] is not d:
+        voce = _frammenti[d.id] = (d, _enc.encode(d.to_public()))
+    return voce[1]
+
+def lista_json(frammenti: Iterable[bytes]) -> bytes:
+    # Array JSON composto da elementi già serializzati (msgspec non aggiunge spazi: basta concatenare)
+    return b"[" + b",".join(frammenti) + b"]"
+
+def cached_json_response(chiave: object, costruisci: Callable[[], bytes]) -> Response:
+    # Restituisce il payload dalla cache; se manca lo ricostruisce sotto lock, così dopo
+    # un'invalidazione un solo thread lo rigenera e gli altri riusano il risultato
+    voce = _cache.get(chiave)
+    if voce is None:
+        with lock:
+            voce = _cache.get(chiave)
+            if voce is None:
+                payload = costruisci()
+                voce = _cache[chiave] = (payload, *comprimi(payload))
+    # I bytes in cache sono già la risposta finale: direct_passthrough li passa al server WSGI così come
+    # sono, senza il generatore di codifica di Werkzeug. Come flask-compress si preferisce brotli a gzip,
+    # ma rispettando i q-value (es. "gzip;q=0" esclude gzip)
+    payload, payload_br, payload_gz = voce
+    accettate = request.accept_encodings
+    if payload_br is not None and accettate["br"] > 0:
+        return risposta_compressa(payload_br, "br")
+    if payload_gz is not None and accettate["gzip"] > 0:
+        return risposta_compressa(payload_gz, "gzip")
+    return risposta_compressa(payload, None)
+
+def risposta_compressa(corpo: bytes, codifica: Optional[str]) -> Response:
+    # Risposta con un payload già compresso nella codifica indicata (None: payload non compresso)
+    resp = Response(corpo, mimetype="application/json", direct_passthrough=True)
+    if codifica is not None:
+        resp.headers["Content-Encoding"] = codifica
+    resp.headers["Vary"] = "Accept-Encoding"  # Codifica già scelta qui: flask-compress non la ritocca
+    return resp
+
+def comprimi(payload: bytes) -> Tuple[Optional[bytes], Optional[bytes]]:
+    # Varianti brotli e gzip di un payload, con la stessa soglia minima e gli stessi livelli di flask-compress
+    if len(payload) < app.config["COMPRESS_MIN_SIZE"]:
+        return None, None
+    return (brotli.compress(payload, quality=app.config["COMPRESS_BR_LEVEL"]),
+            gzip.compress(payload, compresslevel=app.config["COMPRESS_LEVEL"]))
 
 # ---------- Web endpoint ----------
 @app.route('/')
@@ -136,52 +287,44 @@ def homepage():
 # ---------- API Endpoints ----------
 @app.route('/api/distributori', methods=['GET'])
 def api_elenco_distributori():
-    # Restituisce elenco completo dei distributori (ordinati per id)
-    with lock:
-        ordinati = sorted(_distributori, key=lambda x: x.id)
-        return jsonify([d.to_dict() for d in ordinati])
+    # Restituisce elenco completo dei distributori (lo snapshot è già ordinato per id)
+    return cached_json_response("elenco", lambda: lista_json(frammento_public(d) for d in _snapshot))
 
 @app.route('/api/distributori/provincia/<string:provincia>/livelli', methods=['GET'])
-def api_livelli_provincia(provincia):
+def api_livelli_provincia(provincia: str):
     # Filtra i distributori per provincia e restituisce le info con livelli e percentuali
-    with lock:
-        selezionati = [d for d in _distributori if d.provincia.lower() == provincia.lower()]
-        return jsonify([d.to_dict() for d in selezionati])
+    prov = sys.intern(provincia.upper())  # Stessa normalizzazione usata per i distributori
+    if not _by_provincia.get(prov):
+        # Provincia inesistente: lista vuota senza passare dalla cache (che così non cresce senza limiti)
+        return Response(b"[]", mimetype="application/json")
+    return cached_json_response(
+        ("provincia", prov),
+        lambda: lista_json(frammento_public(d) for d in _by_provincia.get(prov, ())),
+    )
 
 @app.route('/api/distributori/<int:did>/livelli', methods=['GET'])
-def api_livelli_distributore(did):
+def api_livelli_distributore(did: int):
     # Restituisce i livelli/percentuali per un distributore specifico
-    with lock:
-        d = find_by_id(did)
-        if d is None:
-            abort(404, "Distributore non trovato")  # Se non esiste, 404
-        return jsonify(d.to_dict())
+    d = find_by_id(did)
+    if d is None:
+        abort(404, "Distributore non trovato")  # Se non esiste, 404
+    return cached_json_response(("id", did), lambda: frammento_public(_by_id[did]))  # Rilettura sotto lock: sempre lo snapshot corrente
 
 @app.route('/api/distributori/map', methods=['GET'])
 def api_mappa_distributori():
     # Endpoint ridotto per la mappa: id, nome, provincia, coordinate e prezzi
-    with lock:
-        return jsonify([
-            {
-                "id": d.id,
-                "nome": d.nome,
-                "provincia": d.provincia,
-                "lat": d.lat,
-                "lon": d.lon,
-                "prezzo_benzina": d.prezzo_benzina,
-                "prezzo_diesel": d.prezzo_diesel,
-            }
-            for d in _distributori
-        ])
+    return cached_json_response("map", lambda: _enc.encode([d.to_mappa() for d in _snapshot]))
 
 @app.route('/api/distributori/provincia/<string:provincia>/prezzi', methods=['PUT'])
-def api_cambia_prezzi_provincia(provincia):
+def api_cambia_prezzi_provincia(provincia: str):
     # Aggiorna i prezzi (benzina/diesel) per tutti i distributori di una provincia
-    data = request.get_json(silent=True)  # Legge JSON dal body; silent evita eccezioni
+    # Legge JSON dal body; silent evita eccezioni. Il parsing passa da ORJSONProvider.loads
+    # (app.json), che riceve direttamente i bytes del body: niente json stdlib né decode UTF-8
+    data = request.get_json(silent=True)
     if not data:
         return jsonify({"error": "Richiesta JSON mancante"}), 400  # Validazione base
 
-    nuovi_prezzi = {}
+    nuovi_prezzi: Dict[str, float] = {}
     if 'benzina' in data:
         try:
             nuovi_prezzi['benzina'] = float(data['benzina'])  # Conversione a float
@@ -194,18 +337,24 @@ def api_cambia_prezzi_provincia(provincia):
             return jsonify({"error": "Prezzo diesel non valido"}), 400  # Errore di formato
     if not nuovi_prezzi:
         return jsonify({"error": "Nessun prezzo fornito"}), 400  # Nessun campo fornito
+    if any(not math.isfinite(p) or p < 0 for p in nuovi_prezzi.values()):
+        # Negativi, NaN e infiniti non sono prezzi (float() accetta "nan"/"inf", che poi diventerebbero null)
+        return jsonify({"error": "Prezzo negativo o non valido"}), 400  # Validazione fatta una volta per tutta la provincia
 
-    aggiornati = []  # Terrà gli ID dei distributori aggiornati
+    # Campi da sostituire, calcolati una volta sola (es. {"prezzo_benzina": 1.77})
+    campi: Dict[str, float] = {"prezzo_" + tipo: prezzo for tipo, prezzo in nuovi_prezzi.items()}
+    prov = sys.intern(provincia.upper())  # Normalizzata fuori dalla sezione critica
     with lock:
-        for d in _distributori:
-            if d.provincia.lower() == provincia.lower():
-                if 'benzina' in nuovi_prezzi:
-                    d.set_prezzo('benzina', nuovi_prezzi['benzina'])
-                if 'diesel' in nuovi_prezzi:
-                    d.set_prezzo('diesel', nuovi_prezzi['diesel'])
-                aggiornati.append(d.id)  # Registra l'ID aggiornato
+        # id -> nuova istanza con i prezzi aggiornati: i lettori continuano a vedere il vecchio snapshot.
+        # I serbatoi sono condivisi con lo snapshot precedente (gli oggetti pubblicati non si modificano)
+        modificati: Dict[int, Distributore] = {d.id: replace(d, **campi) for d in _by_provincia.get(prov, ())}
+        if modificati:
+            # Nuovo snapshot con le copie al posto degli originali (stesso ordine: resta ordinato per id)
+            pubblica_snapshot(tuple(modificati.get(d.id, d) for d in _snapshot))
+    aggiornati: List[int] = list(modificati)  # ID dei distributori aggiornati
     return jsonify({"aggiornati": aggiornati})
 
 if __name__ == '__main__':
-    # Avvia il server API su 0.0.0.0:5001 in debug
-    app.run(host='0.0.0.0', port=5001, debug=True)
+    # Avvia il server API su 0.0.0.0:5001 senza debug (niente reloader);
+    # per i test di carico usare gunicorn: gunicorn -c gunicorn_conf.py
+    app.run(host='0.0.0.0', port=5001, debug=False)
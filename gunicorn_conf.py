@@ -0,0 +1,20 @@
+# Configurazione gunicorn per l'API (al posto del server di sviluppo di Werkzeug)
+# Avvio: gunicorn -c gunicorn_conf.py
+import multiprocessing  # Per calcolare il numero di worker dai core disponibili
+import os  # Per leggere eventuali override da variabili d'ambiente
+
+wsgi_app = "api_server:app"  # App Flask da servire
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5001")  # Stessa porta di api_server.py
+
+# Worker asincroni gevent: ogni worker serve molte connessioni concorrenti con greenlet
+worker_class = "gevent"
+worker_connections = 1000  # Connessioni simultanee massime per worker
+
+# I dati dei distributori sono in memoria nel processo: con più worker ogni processo avrebbe
+# la propria copia e un PUT aggiornerebbe solo quella del worker che lo riceve.
+# Di default si usa quindi un solo worker; GUNICORN_WORKERS=auto usa la formula 2*CPU+1
+# (sensata solo con dati condivisi o in sola lettura, es. per uno stress test sui GET).
+_workers = os.environ.get("GUNICORN_WORKERS", "1")
+workers = multiprocessing.cpu_count() * 2 + 1 if _workers == "auto" else int(_workers)
+
+accesslog = None  # Niente log per richiesta: pesa sulle prestazioni sotto carico
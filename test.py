@@ -3,53 +3,59 @@ import json  # Non strettamente necessario qui, ma utile per debug/print
 import random  # Per scegliere endpoint casuali nello stress test
 import time  # Per misurazioni temporali se servisse
 import threading  # Per eseguire richieste concorrenti su più thread
+from requests.adapters import HTTPAdapter  # Pool di connessioni per la Session
 
 BASE_URL = "http://127.0.0.1:5001"  # Base URL dell'API (api_server.py su porta 5001)
 
+# Session condivisa con pool di connessioni keep-alive: evita una nuova connessione TCP per ogni
+# richiesta (pool_maxsize >= numero di thread dello stress test, nessun retry automatico)
+session = requests.Session()
+session.mount("http://", HTTPAdapter(pool_connections=50, pool_maxsize=50, max_retries=0))
+
 # ---------------------------
 # Test singoli endpoint
 # ---------------------------
 def test_get_elenco():
     print(">>> GET elenco distributori")
-    r = requests.get(f"{BASE_URL}/api/distributori")  # Chiama l'endpoint elenco
+    r = session.get(f"{BASE_URL}/api/distributori")  # Chiama l'endpoint elenco
     print(r.status_code, r.json())  # Stampa status + payload JSON
 
 def test_get_provincia():
     print(">>> GET distributori provincia=MI")
-    r = requests.get(f"{BASE_URL}/api/distributori/provincia/MI/livelli")  # Filtra per MI
+    r = session.get(f"{BASE_URL}/api/distributori/provincia/MI/livelli")  # Filtra per MI
     print(r.status_code, r.json())
 
 def test_get_distributore():
     print(">>> GET livelli distributore id=1")
-    r = requests.get(f"{BASE_URL}/api/distributori/1/livelli")  # Livelli per id=1
+    r = session.get(f"{BASE_URL}/api/distributori/1/livelli")  # Livelli per id=1
     print(r.status_code, r.json())
 
 def test_get_distributore_notfound():
     print(">>> GET distributore inesistente id=999")
-    r = requests.get(f"{BASE_URL}/api/distributori/999/livelli")  # Caso 404 atteso
+    r = session.get(f"{BASE_URL}/api/distributori/999/livelli")  # Caso 404 atteso
     print(r.status_code, r.text)
 
 def test_put_prezzi_ok():
     print(">>> PUT cambio prezzi provincia=MI")
     payload = {"benzina": 1.77, "diesel": 1.66}  # Nuovi prezzi validi
-    r = requests.put(f"{BASE_URL}/api/distributori/provincia/MI/prezzi", json=payload)  # PUT con JSON
+    r = session.put(f"{BASE_URL}/api/distributori/provincia/MI/prezzi", json=payload)  # PUT con JSON
     print(r.status_code, r.json())
 
 def test_put_prezzi_err_json():
     print(">>> PUT senza JSON")
-    r = requests.put(f"{BASE_URL}/api/distributori/provincia/MI/prezzi")  # Nessun body => 400
+    r = session.put(f"{BASE_URL}/api/distributori/provincia/MI/prezzi")  # Nessun body => 400
     print(r.status_code, r.json())
 
 def test_put_prezzi_err_valore():
     print(">>> PUT con valore non valido")
     payload = {"benzina": "abc"}  # Non convertibile a float => errore
-    r = requests.put(f"{BASE_URL}/api/distributori/provincia/MI/prezzi", json=payload)
+    r = session.put(f"{BASE_URL}/api/distributori/provincia/MI/prezzi", json=payload)
     print(r.status_code, r.json())
 
 def test_put_prezzi_negativi():
     print(">>> PUT con prezzo negativo")
     payload = {"diesel": -1.5}  # Valore negativo => l'API dovrebbe rifiutarlo internamente
-    r = requests.put(f"{BASE_URL}/api/distributori/provincia/MI/prezzi", json=payload)
+    r = session.put(f"{BASE_URL}/api/distributori/provincia/MI/prezzi", json=payload)
     print(r.status_code, r.text)
 
 # ---------------------------
@@ -65,7 +71,7 @@ def stress_worker(n):
             f"{BASE_URL}/api/distributori/provincia/MI/livelli",  # Livelli per provincia
         ])
         try:
-            r = requests.get(endpoint, timeout=2)  # Timeout breve per non bloccare
+            r = session.get(endpoint, timeout=2)  # Timeout breve per non bloccare
             print(f"[{threading.current_thread().name}] {endpoint} -> {r.status_code}")
         except Exception as e:
             print(f"[{threading.current_thread().name}] Errore: {e}")  # Logga eventuali errori di rete